@@ -0,0 +1,61 @@
+"""
+    Benchmark of read_rows against the original strip-and-split loader loop.
+
+    A large clean results file is built from timed_event_results.csv, and the
+    same rows are also written with every value quoted.
+
+    Usage: python benchmark_loader.py [copies]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+from entities import read_rows
+
+RESULT_FIELDS = ("identifier", "event", "result")
+
+
+def naive_rows(filename) :
+    """Return the rows of 'filename' read the way the original loader did."""
+    rows = []
+    with open(filename, "r") as data_file:
+        for row in data_file :
+            row = row.strip()
+            row = row[:-1]
+            rows.append(row.split(sep = ","))
+    return rows
+
+
+def best_time(function, filename) :
+    """Return the fastest of several timings of function(filename), in seconds."""
+    return min(timeit.repeat(lambda: function(filename), number=1, repeat=9))
+
+
+def main(copies) :
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, "timed_event_results.csv"), "r") as data_file:
+        lines = [line.strip() for line in data_file if line.strip()]
+
+    with tempfile.TemporaryDirectory() as directory:
+        clean = os.path.join(directory, "clean.csv")
+        quoted = os.path.join(directory, "quoted.csv")
+        with open(clean, "w", newline="") as data_file:
+            data_file.write("\r\n".join(lines * copies) + "\r\n")
+        with open(quoted, "w", newline="") as data_file:
+            data_file.write("".join(
+                ",".join('"{0}"'.format(value) for value in line.split(",")) + "\r\n"
+                for line in lines * copies))
+
+        print("{0} rows".format(len(lines) * copies))
+        print("naive split, clean file   {0:7.1f} ms".format(
+            best_time(naive_rows, clean) * 1000))
+        print("read_rows, clean file     {0:7.1f} ms".format(
+            best_time(lambda name: read_rows(name, RESULT_FIELDS), clean) * 1000))
+        print("read_rows, quoted file    {0:7.1f} ms".format(
+            best_time(lambda name: read_rows(name, RESULT_FIELDS), quoted) * 1000))
+
+
+if __name__ == "__main__" :
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,129 @@
+"""
+    Benchmark of the time taken from start up to the first query.
+
+    Each run is a fresh interpreter that imports processing, loads the data
+    and looks up one event, so import costs are included. Runs are made with
+    load_data, and with load_cached_data using a cold and a warm cache.
+    They are made for the shipped data and for a generated dataset the size
+    of a Winter Games (2900 athletes, 109 events), both as plain values and
+    with every value quoted, which is read with the csv module.
+
+    Usage: python benchmark_startup.py [runs]
+"""
+
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+
+DATA_FILES = ("athletes.csv", "countries.csv", "events.csv",
+              "timed_event_results.csv", "scored_event_results.csv")
+
+FIRST_QUERY = """
+import time
+start = time.perf_counter()
+import processing
+from entities import all_events, {loader}
+{loader}(*{files!r}{cache})
+all_events.find_item({event!r}).get_athletes()
+print(time.perf_counter() - start)
+"""
+
+
+def write_games_dataset(directory, quoted) :
+    """Writes a generated Games-sized dataset and returns the file names.
+
+    Parameters:
+        directory (str): Directory to write the files into.
+        quoted (bool): Whether every value is quoted.
+    """
+    generator = random.Random(2022)
+    rows = {name: [] for name in DATA_FILES}
+    for number in range(91):
+        rows["countries.csv"].append(("C{0:02d}".format(number),
+                                      "Country {0}".format(number)))
+    for number in range(2900):
+        rows["athletes.csv"].append((str(number), "First{0}".format(number),
+                                     "Surname{0}".format(number),
+                                     "C{0:02d}".format(number % 91)))
+    for number in range(109):
+        timed = number % 2 == 0
+        event = "Event {0}".format(number)
+        rows["events.csv"].append((event, "TIMED" if timed else "SCORED"))
+        results = ("timed_event_results.csv" if timed
+                   else "scored_event_results.csv")
+        for athlete in generator.sample(range(2900), 30):
+            rows[results].append((str(athlete), event,
+                                  "{0:.2f}".format(generator.uniform(30, 200))))
+
+    files = []
+    for name in DATA_FILES:
+        files.append(os.path.join(directory, name))
+        with open(files[-1], "w", newline="") as data_file:
+            for row in rows[name]:
+                if quoted:
+                    row = ['"{0}"'.format(value) for value in row]
+                data_file.write(",".join(row) + "\r\n")
+    return tuple(files)
+
+
+def time_first_query(loader, files, event, cache_file=None) :
+    """Return the seconds taken to the first query in a new interpreter.
+
+    Parameters:
+        loader (str): Name of the loading function to use.
+        files (tuple[str]): Names of the data files.
+        event (str): Name of the event looked up by the query.
+        cache_file (str): Cache file to pass to load_cached_data.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    cache = "" if cache_file is None else ", cache_file={0!r}".format(cache_file)
+    code = FIRST_QUERY.format(loader=loader, files=files, event=event,
+                              cache=cache)
+    output = subprocess.run([sys.executable, "-c", code], cwd=here, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output)
+
+
+def report(name, times) :
+    """Print the fastest and median of 'times' in milliseconds."""
+    print("  {0:<12} min {1:7.1f} ms   median {2:7.1f} ms".format(
+        name, min(times) * 1000, statistics.median(times) * 1000))
+
+
+def benchmark(title, files, event, runs, cache_file) :
+    """Print the startup times with and without a cache for one dataset."""
+    no_cache, cold, warm = [], [], []
+    for run in range(runs):
+        no_cache.append(time_first_query("load_data", files, event))
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        cold.append(time_first_query("load_cached_data", files, event,
+                                     cache_file))
+        warm.append(time_first_query("load_cached_data", files, event,
+                                     cache_file))
+    print(title)
+    report("load_data", no_cache)
+    report("cold cache", cold)
+    report("warm cache", warm)
+
+
+def main(runs) :
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as directory:
+        cache_file = os.path.join(directory, "results_cache.pickle")
+        benchmark("Shipped data",
+                  tuple(os.path.join(here, name) for name in DATA_FILES),
+                  "Men's Luge", runs, cache_file)
+        for quoted in (False, True):
+            games = os.path.join(directory, "quoted" if quoted else "plain")
+            os.mkdir(games)
+            benchmark("Games-sized data, " + ("quoted" if quoted else "plain"),
+                      write_games_dataset(games, quoted), "Event 0", runs,
+                      cache_file)
+
+
+if __name__ == "__main__" :
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -11,6 +11,17 @@ __author__ = "Ankit Sharma"
 __email__ = "ankit.sharma@uqconnect.edu.au"
 
 
+import io
+import os
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+from math import ceil, isfinite
+import threading
+
+
+_MEDALS = {1: "Gold", 2: "Silver", 3: "Bronze"}  # Medal awarded for each place.
+_membership_lock = threading.Lock()  # Serialises writers to athletes and countries.
+
 
 class Athlete(object) :
     """Details of an athlete who is competing at the games."""
@@ -49,7 +60,24 @@ class Athlete(object) :
             event (Event): Event in which this athlete competed.
             result (Result): Final result obtained in event.
         """
-        self._results[event] = result_value
+        event.record_result(self, result_value)
+
+    def _set_result(self, event, result_value) :
+        """Sets athlete's 'result' in 'event' and returns the one it replaces.
+
+        Parameters:
+            event (Event): Event in which this athlete competed.
+            result (Result): Final result obtained in event.
+
+        Return:
+            Result: Previous result in 'event', None if there was none.
+        """
+        with _membership_lock:
+            previous = self._results.get(event)
+            results = dict(self._results)
+            results[event] = result_value
+            self._results = results
+        return previous
         
     def add_event(self, event) :
         """Adds event to those in which this athlete will compete.
@@ -57,7 +85,8 @@ class Athlete(object) :
         Parameters:
             event (Event): Event in which this athlete will compete.
         """
-        self._events.append(event)
+        with _membership_lock:
+            self._events = self._events + [event]
         
     def add_events(self, events) :
         """Adds all events to those in which this athlete will compete.
@@ -65,10 +94,15 @@ class Athlete(object) :
         Parameters:
             events (list[Event]): List of events in which this athlete will compete.
         """
-        self._events.append(events)
+        with _membership_lock:
+            self._events = self._events + list(events)
         
     def get_events(self) :
-        """(list[Event]) All events in which this athlete is competing."""
+        """(list[Event]) All events in which this athlete is competing.
+
+        The list is replaced rather than modified when events are added,
+        so it may be iterated safely while other threads are loading data.
+        """
         return self._events
 
     def get_id(self) :
@@ -102,6 +136,35 @@ class Result(object) :
         """
         self._result_value = result_value
         self._place = None
+        self._athlete = None
+        self._event = None
+
+    def set_competitor(self, athlete, event) :
+        """Sets the athlete who obtained this result and the event it was in.
+
+        Parameters:
+            athlete (Athlete): Athlete who obtained this result.
+            event (Event): Event in which this result was obtained.
+        """
+        self._athlete = athlete
+        self._event = event
+
+    def get_athlete(self) :
+        """(Athlete) Athlete who obtained this result, None if not yet set."""
+        return self._athlete
+
+    def get_event(self) :
+        """(Event) Event this result was obtained in, None if not yet set."""
+        return self._event
+
+    def _find_place(self) :
+        """(int) Place in the event's published placings once this result
+                 belongs to an event, else as set; None if not placed.
+        """
+        event = self._event
+        if event is not None:
+            return event.get_placings().find_place(self._athlete)
+        return self._place
 
     def get_place(self) :
         """(str) Place athlete obtained in the final event.
@@ -109,8 +172,9 @@ class Result(object) :
         Raise:
             RuntimeError: if places not yet determined.
         """
-        if self._place != None:
-            return str(self._place)
+        place = self._find_place()
+        if place != None:
+            return str(place)
         else:
             raise RuntimeError("Places not yet determined")
             
@@ -118,14 +182,21 @@ class Result(object) :
     def set_place(self, place) :
         """Sets the place that the athlete achieved in the final event.
 
+        Once this result belongs to an event the place is published in the
+        event's placings, which also records the change in place_changes.
+
         Parameters:
             place (int): Place that athlete achieved in the event.
         """
-        self._place = place
+        event = self._event
+        if event is not None:
+            event.place_athlete(self._athlete, place)
+        else:
+            self._place = place
 
     def places_determined(self) :
         """(bool) Has places been determined yet or not."""
-        if self._place != None:
+        if self._find_place() != None:
             return True
         else:
             return False
@@ -140,15 +211,9 @@ class Result(object) :
         Raise:
             RuntimeError: if places not yet determined.
         """
-        if self._place != None:
-            if self._place == 1:
-                return "Gold"
-            if self._place == 2:
-                return "Silver"
-            if self._place == 3:
-                return "Bronze"
-            else:
-             return ""
+        place = self._find_place()
+        if place != None:
+            return _MEDALS.get(place, "")
         else:
             raise RuntimeError("Places not yet determined")
 
@@ -156,6 +221,154 @@ class Result(object) :
         return f'Result({self._result_value})'
 
 
+class PlacingSnapshot(object) :
+    """An immutable, versioned record of the places in one event."""
+
+    def __init__(self, version, placings) :
+        """
+        Parameters:
+            version (int): Version of the event's placings, 0 if never placed.
+            placings (list[tuple[Athlete, int]]): Athletes paired with the place
+                                                  they achieved, best first.
+        """
+        self._version = version
+        self._placings = tuple(placings)
+        self._places = dict(self._placings)
+
+    def get_version(self) :
+        """(int) Version of the event's placings, 0 if never placed."""
+        return self._version
+
+    def get_placings(self) :
+        """(tuple[tuple[Athlete, int]]) Athletes and their places, best first."""
+        return self._placings
+
+    def get_athletes(self) :
+        """(list[Athlete]) Athletes placed in this snapshot, best first."""
+        return [athlete for athlete, place in self._placings]
+
+    def places_determined(self) :
+        """(bool) Has places been determined yet or not."""
+        return self._version > 0
+
+    def find_place(self, athlete) :
+        """(int) Place 'athlete' obtained in this snapshot, None if not placed."""
+        return self._places.get(athlete)
+
+    def get_place(self, athlete) :
+        """Return the place 'athlete' obtained in this snapshot.
+
+        Parameters:
+            athlete (Athlete): Athlete whose place is wanted.
+
+        Return:
+            str: Place athlete obtained in the event.
+
+        Raise:
+            RuntimeError: if places not yet determined for 'athlete'.
+        """
+        if athlete in self._places:
+            return str(self._places[athlete])
+        else:
+            raise RuntimeError("Places not yet determined")
+
+    def get_medal(self, athlete) :
+        """Return the medal 'athlete' obtained in this snapshot.
+
+        Parameters:
+            athlete (Athlete): Athlete whose medal is wanted.
+
+        Return:
+            str: Medal athlete achieved or empty string if no medal.
+
+        Raise:
+            RuntimeError: if places not yet determined for 'athlete'.
+        """
+        if athlete in self._places:
+            return _MEDALS.get(self._places[athlete], "")
+        else:
+            raise RuntimeError("Places not yet determined")
+
+
+class ValueIndex(object) :
+    """An immutable index of the result values in one event, lowest first."""
+
+    def __init__(self, entries) :
+        """
+        Parameters:
+            entries (list[tuple[float, Athlete]]): Each athlete's result value.
+
+        Raises:
+            ValueError: If a value is not a finite number, as NaN cannot be
+                        ordered for searching.
+        """
+        for value, athlete in entries:
+            if not isfinite(value):
+                raise ValueError("Result value {0!r} is not a finite number"
+                                 .format(value))
+        entries = sorted(entries, key = lambda z : z[0])
+        self._values = [value for value, athlete in entries]
+        self._athletes = [athlete for value, athlete in entries]
+
+    def get_athletes_between(self, low, high) :
+        """Return the athletes whose result value is from 'low' to 'high'.
+
+        Parameters:
+            low (float): Lowest value wanted (inclusive).
+            high (float): Highest value wanted (inclusive).
+
+        Return:
+            list[Athlete]: Matching athletes, lowest value first.
+        """
+        return self._athletes[bisect_left(self._values, low):
+                              bisect_right(self._values, high)]
+
+    def get_athletes_below(self, threshold) :
+        """Return the athletes whose result value is less than 'threshold'.
+
+        Parameters:
+            threshold (float): Value all results must be under.
+
+        Return:
+            list[Athlete]: Matching athletes, lowest value first.
+        """
+        return self._athletes[:bisect_left(self._values, threshold)]
+
+    def get_athletes_above(self, threshold) :
+        """Return the athletes whose result value is greater than 'threshold'.
+
+        Parameters:
+            threshold (float): Value all results must be over.
+
+        Return:
+            list[Athlete]: Matching athletes, lowest value first.
+        """
+        return self._athletes[bisect_right(self._values, threshold):]
+
+    def get_percentile(self, percent) :
+        """Return the result value at 'percent' percentile (nearest rank).
+
+        Parameters:
+            percent (float): Percentile wanted, from 0 to 100.
+
+        Return:
+            float: Smallest value that at least 'percent' of results are at
+                   or below.
+
+        Raises:
+            ValueError: If 'percent' is out of range or there are no results.
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("Percentile must be from 0 to 100")
+        if not self._values:
+            raise ValueError("No results to take a percentile of")
+        rank = max(ceil(percent / 100 * len(self._values)), 1)
+        return self._values[rank - 1]
+
+    def __len__(self) :
+        return len(self._values)
+
+
 class Event(object) :
     """An event in which athletes compete."""
     
@@ -168,7 +381,10 @@ class Event(object) :
         """
         self._event_name = event_name
         self._timed = timed
-        self._athletes = athletes
+        self._athletes = list(athletes)
+        self._placings = PlacingSnapshot(0, [])
+        self._value_index = None  # Built when first needed.
+        self._write_lock = threading.Lock()  # Serialises writers only.
         
     def is_timed(self) :
         """(bool) True if event is timed, False if event is scored."""
@@ -182,6 +398,9 @@ class Event(object) :
     def get_athletes(self) :
         """(list[Athlete]) All athletes currently registered to compete
                            in this event.
+
+        The list is replaced rather than modified when athletes are added,
+        so it may be iterated safely while other threads are loading data.
         """
         return self._athletes
         
@@ -191,7 +410,9 @@ class Event(object) :
         Parameters:
             athlete (Athlete): An athlete who will compete in this event.
         """
-        self._athletes.append(athlete)
+        with self._write_lock:
+            self._athletes = self._athletes + [athlete]
+            self._value_index = None
         
     def add_athletes(self, athletes) :
         """Adds all athletes to those who will compete in this event.
@@ -200,7 +421,145 @@ class Event(object) :
             athletes (list[Athlete]): List of athletes who will compete
                                       in this event.
         """
-        self._athletes.append(athletes)
+        with self._write_lock:
+            self._athletes = self._athletes + list(athletes)
+            self._value_index = None
+
+    def get_value_index(self) :
+        """Return the index of this event's result values, building it if needed.
+
+        The index is built from the current results while other writers are
+        held off, so it cannot miss a result added or replaced meanwhile.
+
+        Return:
+            ValueIndex: Index of every registered athlete's result value.
+
+        Raises:
+            RuntimeError: If a registered athlete has no result in this event.
+            ValueError: If a result value is not a finite number.
+        """
+        index = self._value_index
+        if index is None:
+            with self._write_lock:
+                if self._value_index is None:
+                    entries = []
+                    for athlete in self._athletes:
+                        try:
+                            result = athlete.get_result(self)
+                        except KeyError:
+                            raise RuntimeError("{0} has no result in {1}".format(
+                                athlete.get_full_name(), self._event_name))
+                        entries.append((float(result.get_result()), athlete))
+                    self._value_index = ValueIndex(entries)
+                index = self._value_index
+        return index
+
+    def clear_value_index(self) :
+        """Discards the index of result values, as a result has changed."""
+        with self._write_lock:
+            self._value_index = None
+
+    def get_placings(self) :
+        """(PlacingSnapshot) Most recently published placings for this event.
+
+        Readers never block; the returned snapshot does not change even if
+        new placings are published afterwards.
+        """
+        return self._placings
+
+    def publish_placings(self, placings) :
+        """Sets the places of athletes in this event as a new snapshot.
+
+        Result.get_place and Result.get_medal read the published snapshot,
+        so readers see either all of the old placings or all of the new ones.
+
+        Parameters:
+            placings (list[tuple[Athlete, int]]): Athletes paired with the place
+                                                  they achieved, best first.
+
+        Return:
+            PlacingSnapshot: The newly published snapshot.
+        """
+        with self._write_lock:
+            return self._publish(placings)
+
+    def record_result(self, athlete, result) :
+        """Sets 'athlete's result in this event, replacing any previous one.
+
+        The athlete keeps no place from a replaced result; if 'result' was
+        already given a place, that place is published instead.
+
+        Parameters:
+            athlete (Athlete): Athlete who obtained the result.
+            result (Result): Final result obtained in this event.
+        """
+        with self._write_lock:
+            old_place = self._placings.find_place(athlete)
+            new_place = result._find_place()
+            if old_place != new_place:
+                self._publish_place(athlete, new_place)
+
+            previous = athlete._set_result(self, result)
+            if previous is not None and previous is not result:
+                previous._place = old_place  # Still known once detached.
+                previous.set_competitor(None, None)
+            result.set_competitor(athlete, self)
+            self._value_index = None
+
+    def place_athlete(self, athlete, place) :
+        """Sets the place of one athlete in this event as a new snapshot.
+
+        Parameters:
+            athlete (Athlete): Athlete whose place is being set.
+            place (int): Place the athlete achieved, None to remove it.
+
+        Return:
+            PlacingSnapshot: The newly published snapshot.
+        """
+        with self._write_lock:
+            return self._publish_place(athlete, place)
+
+    def _publish_place(self, athlete, place) :
+        """Publishes the current placings with 'athlete's place replaced.
+           The caller must hold the write lock.
+        """
+        placings = [(other, other_place) for other, other_place
+                    in self._placings.get_placings() if other is not athlete]
+        if place is not None:
+            placings.append((athlete, place))
+        return self._publish(sorted(placings, key = lambda z : z[1]))
+
+    def _publish(self, placings) :
+        """Publishes 'placings' as a new snapshot and logs the places changed.
+           The caller must hold the write lock.
+        """
+        old = self._placings
+        snapshot = PlacingSnapshot(old.get_version() + 1, placings)
+        changes = []
+        athletes = snapshot.get_athletes()
+        athletes += [athlete for athlete in old.get_athletes()
+                     if snapshot.find_place(athlete) is None]
+        for athlete in athletes:
+            old_place = old.find_place(athlete)
+            new_place = snapshot.find_place(athlete)
+            if old_place != new_place:
+                changes.append(PlaceChange(athlete, self, old_place, new_place))
+
+        #The shared log is only held to publish the snapshot and its changes
+        #together; other events are placed in parallel up to this point
+        with place_changes:
+            self._placings = snapshot
+            place_changes.record(changes)
+        return snapshot
+
+    def __getstate__(self) :
+        state = self.__dict__.copy()
+        del state["_write_lock"]  # Locks cannot be pickled.
+        return state
+
+    def __setstate__(self, state) :
+        self.__dict__.update(state)
+        self._write_lock = threading.Lock()
 
     def __str__(self) :
         return "({0}, {1}, {2})".format(self._event_name, self._timed, self._athletes)
@@ -226,7 +585,11 @@ class Country(object) :
         
 
     def get_athletes(self) :
-        """(list[Athlete]) All athletes competing for this country."""
+        """(list[Athlete]) All athletes competing for this country.
+
+        The list is replaced rather than modified when athletes are added,
+        so it may be iterated safely while other threads are loading data.
+        """
         return self._athletes
     
         
@@ -236,7 +599,8 @@ class Country(object) :
         Parameters:
             athlete (Athlete): An athlete who will compete for this country.
         """
-        self._athletes.append(athlete)
+        with _membership_lock:
+            self._athletes = self._athletes + [athlete]
         
     def add_athletes(self, athletes) :
         """Adds all athletes as members of this country's delegation.
@@ -245,7 +609,8 @@ class Country(object) :
             athletes (list[Athlete]): List of athletes who will compete
                                       for this country.
         """
-        self._athletes.append(athletes)
+        with _membership_lock:
+            self._athletes = self._athletes + list(athletes)
 
     def get_name(self) :
         """(str) Country's official name."""
@@ -300,6 +665,120 @@ class ManagedDictionary(object) :
             raise KeyError("Key doesn't correspond to any item")
 
 
+class PlaceChange(object) :
+    """A change to the place of one result."""
+
+    def __init__(self, athlete, event, old_place, new_place) :
+        """
+        Parameters:
+            athlete (Athlete): Athlete whose place changed.
+            event (Event): Event in which the place changed.
+            old_place (int): Place before the change, None if not placed.
+            new_place (int): Place after the change, None if not placed.
+        """
+        self._athlete = athlete
+        self._event = event
+        self._old_place = old_place
+        self._new_place = new_place
+
+    def get_athlete(self) :
+        """(Athlete) Athlete whose place changed."""
+        return self._athlete
+
+    def get_event(self) :
+        """(Event) Event in which the place changed."""
+        return self._event
+
+    def get_old_medal(self) :
+        """(str) Medal held before the change or empty string if no medal."""
+        return _MEDALS.get(self._old_place, "")
+
+    def get_new_medal(self) :
+        """(str) Medal held after the change or empty string if no medal."""
+        return _MEDALS.get(self._new_place, "")
+
+    def __str__(self) :
+        return "({0}, {1}, {2}, {3})".format(self._athlete, self._event.get_name(),
+                                             self._old_place, self._new_place)
+
+
+class ChangeLog(object) :
+    """A log of changes to the places of results.
+
+    Changes made inside a 'with' block on the log only become visible to
+    readers when the block ends, so a reader sees all of them or none.
+    Only the most recent changes are kept; readers that fall further behind
+    must recount from the results themselves.
+    """
+
+    def __init__(self, max_changes=10000) :
+        """
+        Parameters:
+            max_changes (int): Number of changes kept before older ones are
+                               discarded.
+        """
+        self._max_changes = max_changes
+        self._changes = []  # Changes from version _first on, including unpublished.
+        self._first = 0     # Version of the oldest change kept.
+        self._depth = 0     # Nesting of 'with' blocks by the writing thread.
+        self._lock = threading.RLock()
+        #(changes, first version kept, version) as last published to readers
+        self._published = (self._changes, 0, 0)
+
+    def record(self, changes) :
+        """Adds changes of place to the log, visible to readers all together.
+
+        Parameters:
+            changes (list[PlaceChange]): Changes in the order they were made.
+        """
+        with self._lock:
+            self._changes.extend(changes)
+            if self._depth == 0:
+                self._publish()
+
+    def _publish(self) :
+        """Makes all recorded changes visible, discarding old ones if needed."""
+        if len(self._changes) > self._max_changes:
+            discard = len(self._changes) - self._max_changes // 2
+            self._changes = self._changes[discard:]
+            self._first += discard
+        self._published = (self._changes, self._first,
+                           self._first + len(self._changes))
+
+    def get_version(self) :
+        """(int) Number of changes ever made visible to readers."""
+        return self._published[2]
+
+    def get_changes(self, since=0) :
+        """Return the changes made after version 'since'.
+
+        Parameters:
+            since (int): Version after which changes are wanted.
+
+        Return:
+            tuple(list[PlaceChange], int): The changes in the order they were
+                                           made, or None if some of them have
+                                           been discarded, and the version
+                                           they lead to.
+        """
+        changes, first, version = self._published
+        if since < first:
+            return None, version
+        return changes[since - first:version - first], version
+
+    def __enter__(self) :
+        self._lock.acquire()
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) :
+        self._depth -= 1
+        if self._depth == 0:
+            self._publish()
+        self._lock.release()
+        return False
+
+
 """
     Globally defined collections of all key entity objects.
     These are to be used to store all of each type of entity objects that
@@ -308,100 +787,250 @@ class ManagedDictionary(object) :
 all_athletes = ManagedDictionary()
 all_countries = ManagedDictionary()
 all_events = ManagedDictionary()
+place_changes = ChangeLog()
 
 
 
-def load_data(athletes, countries, events,
-              timed_events_results, scored_events_results) :
-    """Loads the data from the named data files.
+def _is_number(value) :
+    """(bool) Whether 'value' can be read as a number."""
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
 
-    Data is loaded into the all_athletes, all_countries and all_events
-    collections. Results are accessible through the objects in these collections.
+
+def _looks_like_header(rows) :
+    """Return whether the first of 'rows' looks like a header.
+
+    As in csv.Sniffer.has_header, each column votes by comparing the first
+    value with those below it (up to 20 rows): a column of numbers votes for
+    a header if the first value is not a number, a column of values of one
+    length if the first value has another length, and a column with few
+    distinct values if the first value is not one of them. Otherwise the
+    column votes against; columns showing no pattern do not vote.
 
     Parameters:
-        athletes (str) : Name of file containing athlete data.
-        countries (str): Name of file containing country data.
-        events (str)   : Name of file containing events data.
-        timed_events_results (str) : Name of file containing results for timed
-                                     events.
-        scored_events_results (str): Name of file containing results for scored
-                                     events.
+        rows (list[tuple(int, list[str])]): Line number and values of each row.
+
+    Return:
+        bool: True if more columns vote for a header than against it.
     """
+    first = rows[0][1]
+    sample = [values for line_num, values in rows[1:21]]
+    votes = 0
+    for column, value in enumerate(first):
+        below = [values[column] for values in sample]
+        if not below:
+            break  # Nothing to compare a single row with.
+        if all(map(_is_number, below)):
+            votes += -1 if _is_number(value) else 1
+        elif len(set(map(len, below))) == 1:
+            votes += -1 if len(value) == len(below[0]) else 1
+        elif len(set(below)) * 2 <= len(below):
+            votes += -1 if value in below else 1
+    return votes > 0
+
+
+def _row_error(filename, line_num, message) :
+    """(ValueError) Error describing a problem with one row of a data file."""
+    return ValueError("{0}, line {1}: {2}".format(filename, line_num, message))
+
+
+def _regular_rows(numbered_rows, field_count, filename, padding) :
+    """Return the rows with a trailing delimiter removed and blank rows skipped.
+
+    Parameters:
+        numbered_rows (iterable[tuple(int, list[str])]): Line number and values
+                                                        of each row.
+        field_count (int): Number of values expected in each row.
+        filename (str): Name of the file the rows came from.
+        padding (str): Characters to remove from the end of a row once its
+                       trailing delimiter is removed.
+
+    Raises:
+        ValueError: If a row does not have one value for each field.
+    """
+    rows = []
+    for line_num, row in numbered_rows:
+        if len(row) != field_count:
+            if len(row) == field_count + 1 and row[-1] == "":
+                row.pop()  # Trailing delimiter
+                row[-1] = row[-1].rstrip(padding)
+            elif not row or row == [""]:
+                continue  # Blank line
+            else:
+                raise _row_error(filename, line_num,
+                                 "expected {0} values but found {1}"
+                                 .format(field_count, len(row)))
+        rows.append((line_num, row))
+    return rows
+
+
+#Characters str.splitlines also ends lines at, besides CR and LF
+_OTHER_LINE_BREAKS = "\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _strip_row(row, padding) :
+    """(list[str]) 'row' with 'padding' removed from its start and end."""
+    if row:
+        row[0] = row[0].lstrip(padding)
+        row[-1] = row[-1].rstrip(padding)
+    return row
+
+
+def read_rows(filename, fields, delimiter=",", quotechar='"', has_header=None) :
+    """Return the rows of a delimited data file.
+
+    Quoted values may contain the delimiter or line breaks, lines may end in
+    CRLF, LF or CR, a single trailing delimiter is ignored and blank lines are
+    skipped. As in the original loader, spaces and tabs at the start and end
+    of each row are removed, but not those around the delimiters within it.
+    Files without any quote characters are split directly, which is faster
+    than the csv module for short rows.
+
+    Parameters:
+        filename (str): Name of the file to read.
+        fields (tuple[str]): Names of the fields expected in each row.
+        delimiter (str): Character separating the values in a row.
+        quotechar (str): Character used to quote values.
+        has_header (bool): True if the first row is a header, False if not,
+                           None to treat it as a header only if it looks
+                           like one (see _looks_like_header).
+
+    Return:
+        list[tuple(int, list[str])]: Line number and values of each data row,
+                                     in file order.
+
+    Raises:
+        ValueError: If a row does not have one value for each field.
+    """
+    with open(filename, "r", newline="") as data_file:
+        text = data_file.read()
+
+    field_count = len(fields)
+    padding = " \t".replace(delimiter, "")  # Never strip empty edge values.
+    if quotechar in text:
+        import csv  # Only needed for quoted files, so not paid for by every import.
+        reader = csv.reader(io.StringIO(text, newline=""),
+                            delimiter=delimiter, quotechar=quotechar)
+        rows = _regular_rows(((reader.line_num, _strip_row(row, padding))
+                              for row in reader),
+                             field_count, filename, padding)
+    else:
+        #Only CR and LF end a line, as in the csv module
+        if any(line_break in text for line_break in _OTHER_LINE_BREAKS):
+            lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            if lines[-1] == "":
+                lines.pop()  # After the final line break
+        else:
+            lines = text.splitlines()
+        lines = map(str.strip, lines, repeat(padding))
+        values = list(map(str.split, lines, repeat(delimiter)))
+        rows = list(zip(range(1, len(values) + 1), values))
+        #Only check row by row if some row has the wrong number of values
+        if list(map(len, values)).count(field_count) != len(values):
+            rows = _regular_rows(rows, field_count, filename, padding)
+
+    if rows and (has_header or (has_header is None and
+                                _looks_like_header(rows))):
+        del rows[0]
+    return rows
+
+
+#Fields of the athletes, countries, events, timed and scored results files
+_DATA_FIELDS = (("identifier", "first_name", "surname", "country_code"),
+                ("code", "name"),
+                ("event", "timed"),
+                ("identifier", "event", "result"),
+                ("identifier", "event", "result"))
+
+_CACHE_FORMAT = 1  # Changed whenever the cached rows are stored differently.
+
+
+def _build_entities(sources, file_rows) :
+    """Builds the entities from the rows of each data file.
+
+    Parameters:
+        sources (list[str]): Names of the athletes, countries, events, timed
+                             event results and scored event results files.
+        file_rows (list[list[tuple(int, list[str])]]): Rows read from each
+                                                        file, see read_rows.
+
+    Return:
+        tuple(list[Athlete], list[Country], list[Event]): Loaded entities.
+
+    Raises:
+        ValueError: If a row refers to an unknown entity or has a bad value.
+    """
+    athletes, countries, events, timed_events_results, scored_events_results = sources
+    athlete_rows, country_rows, event_rows, timed_rows, scored_rows = file_rows
+
     #Load Country data
     country_list = [] #Creating list of countries
-    with open(countries, "r") as country_code_file:
-        for row in country_code_file :
-            row = row.strip()
-            row = row[:-1]
-            code,name = row.split(sep = ",")
-            country_data = Country(name,code)
-            country_list.append(country_data) #Creating a list of identifiers for later use
-
-    #Load Athlete data
-    identifier_list = [] #Creating list of athlete identifiers
-    with open(athletes, "r") as athlete_data_file:
-        for row in athlete_data_file :
-            row = row.strip()
-            row = row[:-1]
-            identifier,first_name,sur_name,code = row.split(sep = ",")
-            athlete_data = Athlete(identifier,first_name,sur_name,code)
-            identifier_list.append(athlete_data) #Creating a list of objects for later use
-
-    for athlete in identifier_list:
-        for country in country_list:
-            if athlete.get_country() == country.get_country_code():
-                country.add_athlete(athlete)
+    country_codes = {} #Countries by code, for linking athletes
+    for line_num,(code,name) in country_rows:
+        country_data = Country(name,code)
+        country_list.append(country_data)
+        country_codes[code] = country_data
+
+    #Load Athlete data, linking each athlete to their country's delegation
+    identifier_list = [] #Creating list of athlete objects
+    athlete_ids = {} #Athletes by identifier, for linking results
+    for line_num,(identifier,first_name,sur_name,code) in athlete_rows:
+        if code not in country_codes:
+            raise _row_error(athletes, line_num,
+                             "unknown country code {0!r}".format(code))
+        country = country_codes[code]
+        athlete_data = Athlete(identifier,first_name,sur_name,country)
+        country.add_athlete(athlete_data)
+        identifier_list.append(athlete_data)
+        athlete_ids[identifier] = athlete_data
 
     #Load Event data
     event_list = []
-    with open(events, "r") as event_file:
-        for row in event_file :
-            row = row.strip()
-            row = row[:-1]
-            event,time = row.split(sep = ",")
-            event_data = Event(event,time,[])
-            event_list.append(event_data) #Creating a list of objects for later use  
-
-    #Load Scored Event data
-    scored_event_data_list = []
-    with open(scored_events_results, "r") as scored_event_results_file:
-        for row in scored_event_results_file :
-            row = row.strip()
-            row = row[:-1]
-            scored_event_data_list.append(row)
-
-    #Load Timed Event data
-    timed_event_data_list = []
-    with open(timed_events_results, "r") as timed_events_results_file:
-        for row in timed_events_results_file :
-            row = row.strip()
-            row = row[:-1]
-            timed_event_data_list.append(row)
-
-    """For athlete in athlete object and in event result we can add events to athlete objects,
+    event_names = {} #Events by name, for linking results
+    for line_num,(event,time) in event_rows:
+        if time.upper() not in ("TIMED", "SCORED"):
+            raise _row_error(events, line_num,
+                             "expected TIMED or SCORED but found {0!r}".format(time))
+        event_data = Event(event,time.upper() == "TIMED",[])
+        event_list.append(event_data)
+        event_names[event] = event_data
+
+    """For each result we can add events to athlete objects,
        add athletes participating in event and athlete's result"""
-    for event in event_list:
-        for athlete in identifier_list:
-            for timed_result in timed_event_data_list:
-                timed_identifier,timed_event,time = timed_result.split(sep = ",")
-                if athlete.get_id() == timed_identifier and event.get_name() == timed_event:
-                    athlete.add_event(event)
-                    event.add_athlete(athlete)
-                    athlete.add_result(event,Result(time))
-
-    """For athlete in athlete object and in event result we can add events to athlete objects,
-       add athletes participating in event and athlete's result"""                        
-    for event in event_list:
-        for athlete in identifier_list:
-            for scored_result in scored_event_data_list:
-                scored_identifier,scored_event,score = scored_result.split(sep = ",")
-                if athlete.get_id() == scored_identifier and event.get_name() == scored_event:
-                    athlete.add_event(event)
-                    event.add_athlete(athlete)
-                    athlete.add_result(event,Result(score))
-                    
+    for results_file, rows in ((timed_events_results, timed_rows),
+                               (scored_events_results, scored_rows)):
+        for line_num,(identifier,event_name,result_value) in rows:
+            if identifier not in athlete_ids:
+                raise _row_error(results_file, line_num,
+                                 "unknown athlete {0!r}".format(identifier))
+            if event_name not in event_names:
+                raise _row_error(results_file, line_num,
+                                 "unknown event {0!r}".format(event_name))
+            try:
+                finite = isfinite(float(result_value))
+            except ValueError:
+                finite = False
+            if not finite:
+                raise _row_error(results_file, line_num,
+                                 "result {0!r} is not a number".format(result_value))
+            athlete = athlete_ids[identifier]
+            event = event_names[event_name]
+            athlete.add_event(event)
+            event.add_athlete(athlete)
+            athlete.add_result(event,Result(result_value))
+
+    return identifier_list, country_list, event_list
+
+
+def _add_to_collections(athlete_list, country_list, event_list) :
+    """Adds loaded entities to the all_athletes, all_countries and all_events
+       collections.
+    """
     #Adding objects to managed dictionary object
-    for athlete in identifier_list:
+    for athlete in athlete_list:
         all_athletes.add_item(athlete.get_id(),athlete)
 
     for country in country_list:
@@ -410,6 +1039,131 @@ def load_data(athletes, countries, events,
     for event in event_list:
         all_events.add_item(event.get_name(),event)
 
+
+def load_data(athletes, countries, events,
+              timed_events_results, scored_events_results,
+              delimiter=",", has_header=None) :
+    """Loads the data from the named data files.
+
+    Data is loaded into the all_athletes, all_countries and all_events
+    collections. Results are accessible through the objects in these collections.
+
+    Parameters:
+        athletes (str) : Name of file containing athlete data.
+        countries (str): Name of file containing country data.
+        events (str)   : Name of file containing events data.
+        timed_events_results (str) : Name of file containing results for timed
+                                     events.
+        scored_events_results (str): Name of file containing results for scored
+                                     events.
+        delimiter (str): Character separating the values in each file.
+        has_header (bool): Whether the files start with a header row, None to
+                           detect it (see read_rows).
+
+    Raises:
+        ValueError: If a row in any file is malformed or refers to an unknown
+                    athlete, country or event; the message gives file and line.
+    """
+    sources = [athletes, countries, events,
+               timed_events_results, scored_events_results]
+    file_rows = [read_rows(source, fields, delimiter, has_header=has_header)
+                 for source, fields in zip(sources, _DATA_FIELDS)]
+    _add_to_collections(*_build_entities(sources, file_rows))
+
+
+def _cache_key(source, options) :
+    """Return what identifies the rows cached for one data file.
+
+    Parameters:
+        source (str): Name of the data file.
+        options (tuple): Options the data file is read with.
+
+    Return:
+        tuple: Cache format, absolute path, modification time and size of
+               the file, followed by the options.
+
+    Raises:
+        OSError: If the data file cannot be found.
+    """
+    status = os.stat(source)
+    return (_CACHE_FORMAT, os.path.abspath(source), status.st_mtime_ns,
+            status.st_size, options)
+
+
+def load_cached_data(athletes, countries, events,
+                     timed_events_results, scored_events_results,
+                     cache_file=None,
+                     delimiter=",", has_header=None) :
+    """Loads the data, reusing rows cached from earlier reads of the same files.
+
+    Behaves like load_data, but the rows of a data file are taken from the
+    cache if they were read from the same file, at the same path and with the
+    same modification time and size, with the same delimiter and header
+    option. Other files are read again and the cache rewritten. Entities are
+    always built from the rows, so only the reading of the files is saved.
+    Reading the cache is no faster than reading the files on the datasets in
+    benchmark_startup.py, up to the size of a Winter Games, so load_data is
+    the faster way to start; the cache only helps where the data files
+    themselves are slow to read.
+
+    Parameters:
+        athletes (str) : Name of file containing athlete data.
+        countries (str): Name of file containing country data.
+        events (str)   : Name of file containing events data.
+        timed_events_results (str) : Name of file containing results for timed
+                                     events.
+        scored_events_results (str): Name of file containing results for scored
+                                     events.
+        cache_file (str): Name of file holding the cached rows, by default
+                          results_cache.pickle next to the athletes file.
+        delimiter (str): Character separating the values in each file.
+        has_header (bool): Whether the files start with a header row, None to
+                           detect it (see read_rows).
+
+    Raises:
+        ValueError: If a row in any file is malformed or refers to an unknown
+                    athlete, country or event; the message gives file and line.
+    """
+    import pickle  # Only needed here, so not paid for by every import.
+
+    if cache_file is None:
+        cache_file = os.path.join(os.path.dirname(os.path.abspath(athletes)),
+                                  "results_cache.pickle")
+    try:
+        with open(cache_file, "rb") as cache:
+            cached = dict(pickle.load(cache))
+    except Exception:
+        cached = {}  # Missing or unreadable, so rebuild it.
+
+    sources = [athletes, countries, events,
+               timed_events_results, scored_events_results]
+    file_rows = []
+    rows_by_key = {}  # Rows of just these files, so the cache does not grow.
+    for source, fields in zip(sources, _DATA_FIELDS):
+        key = _cache_key(source, (delimiter, has_header))
+        rows = cached.get(key)
+        if rows is None:
+            rows = read_rows(source, fields, delimiter, has_header=has_header)
+        file_rows.append(rows)
+        rows_by_key[key] = rows
+    _add_to_collections(*_build_entities(sources, file_rows))
+    if rows_by_key.keys() == cached.keys():
+        return
+
+    #Write to a temporary file first so other processes never read a partial cache
+    temp_file = "{0}.{1}.tmp".format(cache_file, os.getpid())
+    try:
+        with open(temp_file, "wb") as cache:
+            pickle.dump(rows_by_key, cache, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except Exception:
+        pass  # Caching is only an optimisation.
+    finally:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass  # Already moved into place.
+
 if __name__ == "__main__" :
     print("This module provides the entities for the Olympic games results",
           "processing application and is not meant to be executed on its own.")
@@ -19,6 +19,7 @@ __email__ = "ankit.sharma@uqconnect.edu.au"
 
 from entities import Athlete, Result, Event, Country, ManagedDictionary
 from entities import all_athletes, all_countries, all_events, load_data
+from entities import place_changes
 
 from operator import itemgetter
 
@@ -56,23 +57,36 @@ class AthleteResults(ProcessResults) :
         self._athlete = athlete
         self._results = []
         self._place = []
+        self._version = None  # Version of place_changes last processed.
 
     def process(self) :
         """Obtain all the results for this athlete and
            order them from best to worst placing.
            If two or more results have the same place they should be ordered
            by event name in ascending alphabetical order.
+           Results are only reordered if this athlete's places have changed
+           since the last time this was processed.
         """
         super().process()
         AthleteResults._athlete_results_counter += 1
+
+        changes, version = place_changes.get_changes(self._version or 0)
+        if self._version is not None and changes is not None and not any(
+                change.get_athlete() is self._athlete for change in changes):
+            self._version = version
+            return
+        self._place = []
+        self._results = []
         
         for event in self._athlete.get_events():
-            self._place.append((int(self._athlete.get_result(event).get_place()),
+            placings = event.get_placings()
+            self._place.append((int(placings.get_place(self._athlete)),
                                event.get_name(),self._athlete.get_result(event)))
 
         
         for place in sorted(self._place):
             self._results.append(place[2])
+        self._version = version
 
     def get_results(self) :
         """Obtain the processed results for _athlete.
@@ -177,18 +191,22 @@ class DeterminePlaces(ProcessResults) :
         "If there is a tie, the place following the tie skips by the number of tied athletes"
         pos = 1
         tied_athlete_count = 0
+        placings = []
         
         for position in results_sorted:
             self._athlete = position[0]
             if tied_athlete_count == 0:
-                self._athlete.get_result(self._event).set_place(pos)
+                placings.append((self._athlete, pos))
                 pos += 1
                 pos += tied_athlete_count
                 tied_athlete_count = 0
             else:
-                self._athlete.get_result(self._event).set_place(pos)
+                placings.append((self._athlete, pos))
                 tied_athlete_count += 1
 
+        #Publish all places at once so concurrent readers never see a partial event
+        self._event.publish_placings(placings)
+
     def get_results(self) :
         """Obtain the processed results for _event.
 
@@ -235,23 +253,37 @@ class EventResults(ProcessResults):
         self._event = event
         self._results = []
         self._athletes = []
+        self._version = None  # Version of place_changes last processed.
 
     def process(self) :
-        """Obtain all athletes for this event
+        """Obtain all athletes for this event.
+           Athletes are only reordered if places in this event have changed
+           since the last time this was processed.
         """
         super().process()
         EventResults._event_results_counter += 1
-        self._athletes = self._event.get_athletes()
+
+        changes, version = place_changes.get_changes(self._version or 0)
+        if self._version is not None and changes is not None and not any(
+                change.get_event() is self._event for change in changes):
+            self._version = version
+            return
+
+        #Read from one snapshot so places cannot change part way through
+        placings = self._event.get_placings()
+        if not placings.places_determined():
+            raise RuntimeError("Places not yet determined")
+        self._athletes = placings.get_athletes()
 
         results = {}
         for athlete in self._athletes:
-            result = athlete.get_result(self._event)
-            results[athlete] = result
+            results[athlete] = placings.get_place(athlete)
 
         #Sort results by places and athlete name
         results_list = results.items()
-        results_sorted = sorted(results_list, key = lambda z : (int(z[1].get_place()), str(z[0].get_full_name())))
+        results_sorted = sorted(results_list, key = lambda z : (int(z[1]), str(z[0].get_full_name())))
         self._results = [x[0] for x in results_sorted]
+        self._version = version
 
     def get_results(self) :
         """Obtain the processed results for _event.
@@ -265,7 +297,7 @@ class EventResults(ProcessResults):
             ValueError: If process has not yet been executed.
         """
         if self._results != []:
-            print(self._results)
+            return self._results
         else:
             raise ValueError ('Process has not yet been executed')
 
@@ -294,27 +326,38 @@ class CountryResults(ProcessResults):
         self._bronze = 0
         self._athlete = []
         self._results = []
+        self._version = 0  # Version of place_changes last processed.
+        self._members = set()  # Athletes counted, from _members_list.
+        self._members_list = None  # Country's athlete list when last counted.
 
     def process(self):
         """
             Determine how many gold, silver and bronze medals were won by athletes who
             competed for the country.
+            Only place changes made since the last time this was processed are
+            applied, so processing again never double counts medals. If the
+            delegation has changed every change is applied again, and if the
+            changes needed are no longer logged the medals are recounted.
         """
         super().process()
         CountryResults._country_results_counter += 1
 
-        
-        # Add medal count based on athlete perforamnce
-        for athlete in self._country.get_athletes():
-            for event in athlete.get_events():
-                if athlete.get_result(event).get_medal()=='Gold':
-                    self._gold += 1
-                elif athlete.get_result(event).get_medal()=='Silver':
-                    self._silver += 1
-                elif athlete.get_result(event).get_medal()=='Bronze':
-                    self._bronze += 1
-                else:
-                    pass
+        athletes = self._country.get_athletes()
+        changes, version = place_changes.get_changes(self._version)
+        if athletes is not self._members_list:
+            self._gold = self._silver = self._bronze = 0
+            self._members = set(athletes)
+            self._members_list = athletes
+            changes, version = place_changes.get_changes(0)
+        if changes is None:
+            self._recount()
+        else:
+            self._version = version
+            # Apply medal changes based on athlete perforamnce
+            for change in changes:
+                if change.get_athlete() in self._members:
+                    self._add_medal(change.get_old_medal(), -1)
+                    self._add_medal(change.get_new_medal(), 1)
 
         #Storing result in self._results
         gold = self._gold
@@ -323,6 +366,33 @@ class CountryResults(ProcessResults):
         
         self._results = [gold,silver,bronze, len(self._country.get_athletes())]
         
+    def _add_medal(self, medal, count):
+        """Adds 'count' to the number of 'medal' medals won by the country."""
+        if medal=='Gold':
+            self._gold += count
+        elif medal=='Silver':
+            self._silver += count
+        elif medal=='Bronze':
+            self._bronze += count
+        else:
+            pass
+
+    def _recount(self):
+        """Count the medals from each athlete's results, while the place change
+           log is held so no results change part way through.
+        """
+        with place_changes:
+            self._version = place_changes.get_version()
+            self._gold = self._silver = self._bronze = 0
+            for athlete in self._members:
+                for event in athlete.get_events():
+                    try:
+                        result = athlete.get_result(event)
+                    except KeyError:
+                        continue  # No result in this event yet.
+                    if result.places_determined():
+                        self._add_medal(result.get_medal(), 1)
+
     def get_results(self):
         if self._results != []:
             return self._results
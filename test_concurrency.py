@@ -0,0 +1,95 @@
+"""
+    Stress tests for reading event placings while they are being re-placed.
+"""
+
+import random
+import threading
+import unittest
+
+from entities import Athlete, Result, Event, Country
+from processing import DeterminePlaces, EventResults, CountryResults
+
+
+class ConcurrentPlacingTest(unittest.TestCase) :
+    """Readers on other threads must only ever see placings as published.
+
+    Replacing a result takes that athlete out of the event's placings until
+    it is placed again, so only placings published by DeterminePlaces are
+    expected to be complete.
+    """
+
+    NUM_ATHLETES = 40
+    NUM_READERS = 4
+    NUM_PLACINGS = 300
+
+    def setUp(self) :
+        self.country = Country("Australia", "AUS")
+        self.event = Event("Men's Luge", True, [])
+        self.athletes = []
+        for i in range(self.NUM_ATHLETES):
+            athlete = Athlete(str(i), "First{0}".format(i), "Last", self.country)
+            athlete.add_event(self.event)
+            athlete.add_result(self.event, Result(random.uniform(180, 200)))
+            self.event.add_athlete(athlete)
+            self.country.add_athlete(athlete)
+            self.athletes.append(athlete)
+        DeterminePlaces(self.event).process()
+
+    def _check_snapshot(self, failures, incomplete) :
+        placings = self.event.get_placings()
+        places = [int(placings.get_place(athlete))
+                  for athlete in placings.get_athletes()]
+        if len(set(places)) != len(places) or places != sorted(places):
+            failures.append("inconsistent places {0}".format(places))
+        if sorted(places) != list(range(1, self.NUM_ATHLETES + 1)):
+            incomplete.add(placings.get_version())
+
+    def _check_medals(self, country_results, failures) :
+        country_results.process()
+        medals = country_results.get_results()[:3]
+        if any(count not in (0, 1) for count in medals):
+            failures.append("medals {0}".format(medals))
+
+    def _read(self, stop, failures, incomplete) :
+        country_results = CountryResults(self.country)
+        while not stop.is_set():
+            try:
+                self._check_snapshot(failures, incomplete)
+                EventResults(self.event).process()
+                self._check_medals(country_results, failures)
+                self._check_medals(CountryResults(self.country), failures)
+            except Exception as error:
+                failures.append(repr(error))
+
+    def test_readers_see_complete_placings(self) :
+        stop = threading.Event()
+        failures = []
+        incomplete = set()  # Versions seen without every athlete placed.
+        placed = set()      # Versions published by DeterminePlaces.
+        readers = [threading.Thread(target=self._read,
+                                    args=(stop, failures, incomplete))
+                   for i in range(self.NUM_READERS)]
+        for reader in readers:
+            reader.start()
+        try:
+            for i in range(self.NUM_PLACINGS):
+                for athlete in self.athletes:
+                    athlete.add_result(self.event,
+                                       Result(random.uniform(180, 200)))
+                DeterminePlaces(self.event).process()
+                placed.add(self.event.get_placings().get_version())
+        finally:
+            stop.set()
+            for reader in readers:
+                reader.join()
+
+        self.assertEqual(failures[:5], [])
+        self.assertEqual(incomplete & placed, set())
+        country_results = CountryResults(self.country)
+        country_results.process()
+        self.assertEqual(country_results.get_results(),
+                         [1, 1, 1, self.NUM_ATHLETES])
+
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,330 @@
+"""
+    Tests for loading the entities from data files.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import entities
+
+from entities import Athlete, Result, Event, Country, ValueIndex
+from entities import all_athletes, all_countries
+from entities import read_rows, load_data, load_cached_data
+
+
+def write_dataset(directory, country, athlete) :
+    """Writes a one-athlete dataset to 'directory' and returns the file names.
+
+    Parameters:
+        directory (str): Directory to write the files into.
+        country (tuple[str, str]): Country code and name.
+        athlete (tuple[str, str, str]): Athlete identifier, first name and surname.
+    """
+    contents = {
+        "athletes.csv": "{0},{1},{2},{3}\r\n".format(*(athlete + country[:1])),
+        "countries.csv": "{0},{1}\r\n".format(*country),
+        "events.csv": "Men's Luge,TIMED\r\n",
+        "timed_event_results.csv": "{0},Men's Luge,190.5\r\n".format(athlete[0]),
+        "scored_event_results.csv": "",
+    }
+    files = []
+    for name in ("athletes.csv", "countries.csv", "events.csv",
+                 "timed_event_results.csv", "scored_event_results.csv"):
+        files.append(os.path.join(directory, name))
+        with open(files[-1], "w", newline="") as data_file:
+            data_file.write(contents[name])
+    return files
+
+
+def write_file(directory, name, contents) :
+    """(str) Writes 'contents' to file 'name' in 'directory' and returns its path."""
+    path = os.path.join(directory, name)
+    with open(path, "w", newline="") as data_file:
+        data_file.write(contents)
+    return path
+
+
+class ReadRowsTest(unittest.TestCase) :
+    """Rows are read correctly in each supported dialect."""
+
+    FIELDS = ("identifier", "first_name", "surname", "country_code")
+
+    def setUp(self) :
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self) :
+        self._directory.cleanup()
+
+    def read(self, contents, **options) :
+        path = write_file(self.directory, "data.csv", contents)
+        return read_rows(path, self.FIELDS, **options)
+
+    def test_crlf_without_trailing_delimiter(self) :
+        self.assertEqual(self.read("1,Rohan,Chapman-Davies,AUS\r\n2,Matt,Graham,AUS"),
+                         [(1, ["1", "Rohan", "Chapman-Davies", "AUS"]),
+                          (2, ["2", "Matt", "Graham", "AUS"])])
+
+    def test_trailing_delimiter_and_blank_lines(self) :
+        self.assertEqual(self.read("1,Rohan,Chapman-Davies,AUS,\n\n2,Matt,Graham,AUS,\n"),
+                         [(1, ["1", "Rohan", "Chapman-Davies", "AUS"]),
+                          (3, ["2", "Matt", "Graham", "AUS"])])
+
+    def test_quoted_values(self) :
+        self.assertEqual(self.read('1,"Rohan, Jr",Chapman-Davies,AUS\r\n'
+                                   '2,Matt,"Gra\r\nham",AUS\r\n3,Brodie,Summers,AUS\r\n'),
+                         [(1, ["1", "Rohan, Jr", "Chapman-Davies", "AUS"]),
+                          (3, ["2", "Matt", "Gra\r\nham", "AUS"]),
+                          (4, ["3", "Brodie", "Summers", "AUS"])])
+
+    def test_delimiter(self) :
+        self.assertEqual(self.read("1;Rohan;Chapman-Davies;AUS\n", delimiter=";"),
+                         [(1, ["1", "Rohan", "Chapman-Davies", "AUS"])])
+
+    def test_header(self) :
+        header = "Identifier,First Name,Surname,Country Code\n"
+        self.assertEqual(self.read(header + "1,Rohan,Chapman-Davies,AUS\n"),
+                         [(2, ["1", "Rohan", "Chapman-Davies", "AUS"])])
+        self.assertEqual(self.read("id,first,last,code\n1,Rohan,Chapman-Davies,AUS\n",
+                                   has_header=True),
+                         [(2, ["1", "Rohan", "Chapman-Davies", "AUS"])])
+        self.assertEqual(len(self.read(header, has_header=False)), 1)
+
+    def test_header_detected_from_values(self) :
+        path = write_file(self.directory, "countries.csv",
+                          "Code,Country\r\nAUS,Australia\r\nAUT,Austria\r\n")
+        self.assertEqual(read_rows(path, ("code", "name")),
+                         [(2, ["AUS", "Australia"]), (3, ["AUT", "Austria"])])
+        path = write_file(self.directory, "events.csv",
+                          "Event,Type\nMen's Luge,TIMED\nMen's Aerials,SCORED\n"
+                          "Women's Luge,TIMED\nWomen's Aerials,SCORED\n")
+        self.assertEqual(read_rows(path, ("event", "timed"))[0],
+                         (2, ["Men's Luge", "TIMED"]))
+
+    def test_only_line_breaks_end_lines(self) :
+        expected = [(1, ["1", "Ro\x0bhan", "Chapman\u2028Davies", "AUS"]),
+                    (2, ["2", "Matt\x1c", "Gra\x85ham", "AUS"]),
+                    (3, ["3", "Brodie", "Summers", "AUS"])]
+        plain = ("1,Ro\x0bhan,Chapman\u2028Davies,AUS\r\n"
+                 "2,Matt\x1c,Gra\x85ham,AUS\r3,Brodie,Summers,AUS\n")
+        self.assertEqual(self.read(plain), expected)
+        self.assertEqual(self.read(plain.replace("Brodie", '"Brodie"')), expected)
+
+    def test_spaces_at_row_ends_removed(self) :
+        expected = [(1, ["1", "Rohan", "Chapman-Davies", "AUS"]),
+                    (2, ["2", "Matt ", "Graham", "AUS"])]
+        plain = " 1,Rohan,Chapman-Davies,AUS \r\n\t2,Matt ,Graham,AUS\t"
+        self.assertEqual(self.read(plain), expected)
+        self.assertEqual(self.read(plain.replace("Graham", '"Graham"')), expected)
+        self.assertEqual(self.read("1\tRohan\tChapman-Davies\tAUS \n", delimiter="\t"),
+                         [(1, ["1", "Rohan", "Chapman-Davies", "AUS"])])
+        self.assertEqual(self.read("1,Rohan,Chapman-Davies,AUS , \n"),
+                         [(1, ["1", "Rohan", "Chapman-Davies", "AUS"])])
+
+    def test_wrong_number_of_values(self) :
+        with self.assertRaisesRegex(ValueError, r"data\.csv, line 2: expected 4"):
+            self.read("1,Rohan,Chapman-Davies,AUS\n2,Matt,AUS\n")
+
+
+class LoadDataErrorTest(unittest.TestCase) :
+    """Rows that refer to unknown entities are reported with file and line."""
+
+    def setUp(self) :
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.files = write_dataset(self.directory, ("NOR", "Norway"),
+                                   ("9010", "Marit", "Bjoergen"))
+
+    def tearDown(self) :
+        self._directory.cleanup()
+
+    def assert_load_error(self, name, contents, message) :
+        write_file(self.directory, name, contents)
+        with self.assertRaisesRegex(ValueError, message):
+            load_data(*self.files)
+
+    def test_unknown_country(self) :
+        self.assert_load_error("athletes.csv", "9010,Marit,Bjoergen,NOR\n9011,Ole,Bjoerndalen,NRW\n",
+                               r"athletes\.csv, line 2: unknown country code 'NRW'")
+
+    def test_padded_country_code_found(self) :
+        write_file(self.directory, "athletes.csv", "9010,Marit,Bjoergen,NOR \r\n")
+        load_data(*self.files)
+        self.assertEqual(all_countries.find_item("Norway").get_athletes(),
+                         [all_athletes.find_item("9010")])
+
+    def test_unknown_athlete(self) :
+        self.assert_load_error("timed_event_results.csv", "9999,Men's Luge,190.5\n",
+                               r"timed_event_results\.csv, line 1: unknown athlete '9999'")
+
+    def test_unknown_event(self) :
+        self.assert_load_error("scored_event_results.csv", "9010,Men's Curling,81.5\n",
+                               r"scored_event_results\.csv, line 1: unknown event")
+
+    def test_result_not_a_number(self) :
+        self.assert_load_error("timed_event_results.csv", "9010,Men's Luge,DNF\n",
+                               r"line 1: result 'DNF' is not a number")
+
+    def test_result_not_finite(self) :
+        for value in ("nan", "inf", "-Infinity"):
+            self.assert_load_error("timed_event_results.csv",
+                                   "9010,Men's Luge,{0}\n".format(value),
+                                   r"line 1: result '{0}' is not a number".format(value))
+
+
+class ValueIndexTest(unittest.TestCase) :
+    """Range, threshold and percentile queries over an event's results."""
+
+    VALUES = ["69.99", "69.24", "70.0", "70.0", "71.5", "68.5"]
+
+    def setUp(self) :
+        country = Country("Canada", "CAN")
+        self.event = Event("Men's Speedskating 1000m", True, [])
+        self.athletes = []
+        for i, value in enumerate(self.VALUES):
+            athlete = Athlete(str(i), "Skater", str(i), country)
+            athlete.add_event(self.event)
+            athlete.add_result(self.event, Result(value))
+            self.event.add_athlete(athlete)
+            self.athletes.append(athlete)
+
+    def values(self, athletes) :
+        return [athlete.get_result(self.event).get_result() for athlete in athletes]
+
+    def test_between_includes_both_bounds(self) :
+        index = self.event.get_value_index()
+        self.assertEqual(self.values(index.get_athletes_between(69.24, 70.0)),
+                         ["69.24", "69.99", "70.0", "70.0"])
+        self.assertEqual(index.get_athletes_between(72, 80), [])
+
+    def test_below_and_above_exclude_threshold(self) :
+        index = self.event.get_value_index()
+        self.assertEqual(self.values(index.get_athletes_below(70.0)),
+                         ["68.5", "69.24", "69.99"])
+        self.assertEqual(self.values(index.get_athletes_above(70.0)), ["71.5"])
+        self.assertEqual(index.get_athletes_below(68.5), [])
+        self.assertEqual(index.get_athletes_above(71.5), [])
+
+    def test_percentiles(self) :
+        index = self.event.get_value_index()
+        self.assertEqual(index.get_percentile(0), 68.5)
+        self.assertEqual(index.get_percentile(50), 69.99)
+        self.assertEqual(index.get_percentile(100), 71.5)
+        with self.assertRaises(ValueError):
+            index.get_percentile(101)
+        with self.assertRaises(ValueError):
+            ValueIndex([]).get_percentile(50)
+        self.assertEqual(len(ValueIndex([])), 0)
+
+    def test_invalidated_by_add_result(self) :
+        self.assertEqual(len(self.event.get_value_index().get_athletes_below(69)), 1)
+        self.athletes[0].add_result(self.event, Result("60.1"))
+        self.assertEqual(self.values(self.event.get_value_index().get_athletes_below(69)),
+                         ["60.1", "68.5"])
+
+    def test_invalidated_by_add_athlete(self) :
+        self.assertEqual(len(self.event.get_value_index()), len(self.VALUES))
+        athlete = Athlete("99", "Skater", "99", None)
+        athlete.add_result(self.event, Result("67.0"))
+        self.event.add_athlete(athlete)
+        self.assertEqual(self.event.get_value_index().get_percentile(0), 67.0)
+
+    def test_non_finite_value_rejected(self) :
+        self.athletes[0].add_result(self.event, Result("nan"))
+        with self.assertRaisesRegex(ValueError, "nan is not a finite number"):
+            self.event.get_value_index()
+        with self.assertRaises(ValueError):
+            ValueIndex([(70.0, None), (float("inf"), None)])
+
+    def test_athlete_without_result(self) :
+        self.event.add_athlete(Athlete("98", "Skater", "Unplaced", None))
+        with self.assertRaisesRegex(RuntimeError, "Skater Unplaced has no result"):
+            self.event.get_value_index()
+
+
+class LoadCachedDataTest(unittest.TestCase) :
+    """The cache is only reused for exactly the data it was built from."""
+
+    def setUp(self) :
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self) :
+        self._directory.cleanup()
+
+    def test_cache_written_next_to_data(self) :
+        files = write_dataset(self.directory, ("NZL", "New Zealand"),
+                              ("9001", "Zoi", "Sadowski-Synnott"))
+        load_cached_data(*files)
+        self.assertEqual(os.listdir(self.directory).count("results_cache.pickle"), 1)
+        self.assertFalse([name for name in os.listdir(self.directory)
+                          if name.endswith(".tmp")])
+
+        load_cached_data(*files)
+        self.assertEqual(all_athletes.find_item("9001").get_full_name(),
+                         "Zoi Sadowski-Synnott")
+
+    def test_other_dataset_not_served_from_cache(self) :
+        cache_file = os.path.join(self.directory, "shared.pickle")
+        first = os.path.join(self.directory, "first")
+        second = os.path.join(self.directory, "second")
+        os.mkdir(first)
+        os.mkdir(second)
+        first_files = write_dataset(first, ("SUI", "Switzerland"),
+                                    ("9002", "Sarah", "Hoefflin"))
+        second_files = write_dataset(second, ("SLO", "Slovenia"),
+                                     ("9003", "Jakov", "Fak"))
+        for name in second_files:
+            os.utime(name, (0, 0))  # Older than the cache built below.
+
+        load_cached_data(*first_files, cache_file=cache_file)
+        load_cached_data(*second_files, cache_file=cache_file)
+        self.assertEqual(all_countries.find_item("Slovenia").get_country_code(),
+                         "SLO")
+        self.assertEqual(all_athletes.find_item("9003").get_full_name(),
+                         "Jakov Fak")
+
+    def test_options_not_served_from_cache(self) :
+        files = write_dataset(self.directory, ("CZE", "Czechia"),
+                              ("9004", "Ester", "Ledecka"))
+        load_cached_data(*files)
+        #The files are unchanged, but must be read again with the new delimiter
+        with self.assertRaisesRegex(ValueError, "expected 4 values but found 1"):
+            load_cached_data(*files, delimiter=";")
+
+    def test_only_changed_files_read_again(self) :
+        files = write_dataset(self.directory, ("AUT", "Austria"),
+                              ("9005", "Anna", "Gasser"))
+        load_cached_data(*files)
+        with open(files[3], "a", newline="") as results:
+            results.write("9005,Men's Luge,191.0\r\n")
+        with mock.patch("entities.read_rows", wraps=read_rows) as reader:
+            load_cached_data(*files)
+        self.assertEqual([call.args[0] for call in reader.call_args_list],
+                         [files[3]])
+
+    def test_other_cache_format_not_used(self) :
+        files = write_dataset(self.directory, ("GER", "Germany"),
+                              ("9006", "Natalie", "Geisenberger"))
+        load_cached_data(*files)
+        with mock.patch("entities._CACHE_FORMAT", entities._CACHE_FORMAT + 1), \
+             mock.patch("entities.read_rows", wraps=read_rows) as reader:
+            load_cached_data(*files)
+        self.assertEqual(reader.call_count, len(files))
+
+    def test_cache_write_error_not_raised(self) :
+        files = write_dataset(self.directory, ("NOR", "Norway"),
+                              ("9007", "Therese", "Johaug"))
+        with mock.patch("pickle.dump", side_effect=RecursionError):
+            load_cached_data(*files)
+        self.assertEqual(all_athletes.find_item("9007").get_full_name(),
+                         "Therese Johaug")
+        self.assertEqual(os.listdir(self.directory).count("results_cache.pickle"), 0)
+        self.assertFalse([name for name in os.listdir(self.directory)
+                          if name.endswith(".tmp")])
+
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+    Tests for the logical processing classes.
+"""
+
+import os
+import unittest
+
+from entities import Athlete, Result, Event, Country, ChangeLog, PlaceChange
+from entities import all_athletes, all_countries, all_events, load_data
+from processing import DeterminePlaces, CountryResults, EventResults
+from processing import AthleteResults
+
+DATA_FILES = [os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+              for name in ("athletes.csv", "countries.csv", "events.csv",
+                           "timed_event_results.csv", "scored_event_results.csv")]
+
+
+def recount_medals(country) :
+    """Return [gold, silver, bronze] for 'country' counted from every result."""
+    medals = {"Gold": 0, "Silver": 0, "Bronze": 0, "": 0}
+    for athlete in country.get_athletes():
+        for event in athlete.get_events():
+            result = athlete.get_result(event)
+            if result.places_determined():
+                medals[result.get_medal()] += 1
+    return [medals["Gold"], medals["Silver"], medals["Bronze"]]
+
+
+def event_medals(country) :
+    """Return [gold, silver, bronze] for 'country' from each EventResults."""
+    medals = {"Gold": 0, "Silver": 0, "Bronze": 0, "": 0}
+    members = set(country.get_athletes())
+    for event in all_events.get_items():
+        results = EventResults(event)
+        results.process()
+        for athlete in results.get_results():
+            if athlete in members:
+                medals[athlete.get_result(event).get_medal()] += 1
+    return [medals["Gold"], medals["Silver"], medals["Bronze"]]
+
+
+class CountryResultsTest(unittest.TestCase) :
+    """Medal counts applied from the place change log match a full recount."""
+
+    def setUp(self) :
+        load_data(*DATA_FILES)
+        for event in all_events.get_items():
+            DeterminePlaces(event).process()
+        self.countries = all_countries.get_items()
+        self.country_results = {}
+        for country in self.countries:
+            self.country_results[country] = CountryResults(country)
+            self.country_results[country].process()
+
+    def assert_consistent(self) :
+        for country in self.countries:
+            results = self.country_results[country]
+            results.process()
+            self.assertEqual(results.get_results()[:3], recount_medals(country),
+                             country.get_name())
+            fresh = CountryResults(country)
+            fresh.process()
+            self.assertEqual(fresh.get_results()[:3], recount_medals(country),
+                             country.get_name())
+
+    def test_process_again_does_not_double_count(self) :
+        self.assert_consistent()
+        self.assert_consistent()
+
+    def test_correction_replacing_result(self) :
+        athlete = all_athletes.find_item("1")
+        moguls = all_events.find_item("Men's Moguls")
+        self.assertEqual(athlete.get_result(moguls).get_medal(), "Bronze")
+
+        athlete.add_result(moguls, Result("99.0"))
+        self.assert_consistent()
+        DeterminePlaces(moguls).process()
+        self.assert_consistent()
+
+    def test_correction_aggregates_agree(self) :
+        athlete = all_athletes.find_item("1")
+        moguls = all_events.find_item("Men's Moguls")
+        country = athlete.get_country()
+        event_results = EventResults(moguls)
+        event_results.process()
+        athlete_results = AthleteResults(athlete)
+        athlete_results.process()
+        self.assertIn(athlete, event_results.get_results())
+
+        #Until the event is placed again the athlete has no place in it
+        athlete.add_result(moguls, Result("99.0"))
+        event_results.process()
+        self.assertNotIn(athlete, event_results.get_results())
+        self.assertFalse(athlete.get_result(moguls).places_determined())
+        self.assertRaises(RuntimeError, athlete_results.process)
+        self.country_results[country].process()
+        self.assertEqual(self.country_results[country].get_results()[:3],
+                         event_medals(country))
+
+        DeterminePlaces(moguls).process()
+        event_results.process()
+        athlete_results.process()
+        placings = moguls.get_placings()
+        self.assertEqual(event_results.get_results(), placings.get_athletes())
+        result = athlete.get_result(moguls)
+        self.assertIn(result, athlete_results.get_results())
+        self.assertEqual(result.get_place(), placings.get_place(athlete))
+        self.country_results[country].process()
+        self.assertEqual(self.country_results[country].get_results()[:3],
+                         event_medals(country))
+        self.assert_consistent()
+
+    def test_country_given_as_code(self) :
+        country = Country("Italy", "ITA")
+        athlete = Athlete("9100", "Arianna", "Fontana", "ITA")
+        country.add_athlete(athlete)
+        event = Event("Women's Short Track 500m", True, [athlete])
+        athlete.add_event(event)
+        athlete.add_result(event, Result("42.569"))
+        DeterminePlaces(event).process()
+
+        results = CountryResults(country)
+        results.process()
+        self.assertEqual(results.get_results(), [1, 0, 0, 1])
+
+    def test_place_set_before_result_added(self) :
+        country = Country("Italy", "ITA")
+        athlete = Athlete("9101", "Michela", "Moioli", country)
+        country.add_athlete(athlete)
+        event = Event("Women's Snowboard Cross", True, [athlete])
+        athlete.add_event(event)
+        result = Result("1")
+        result.set_place(1)
+
+        results = CountryResults(country)
+        results.process()
+        athlete.add_result(event, result)
+        results.process()
+        self.assertEqual(results.get_results(), [1, 0, 0, 1])
+
+
+class ChangeLogTest(unittest.TestCase) :
+    """Only recent changes are kept, and readers learn when they missed some."""
+
+    def test_old_changes_discarded(self) :
+        log = ChangeLog(max_changes=4)
+        for place in range(10):
+            log.record([PlaceChange(None, None, None, place)])
+        changes, version = log.get_changes(0)
+        self.assertIsNone(changes)
+        self.assertEqual(version, 10)
+        changes, version = log.get_changes(8)
+        self.assertEqual(len(changes), 2)
+        self.assertEqual(log.get_changes(version), ([], 10))
+
+    def test_batch_visible_at_end(self) :
+        log = ChangeLog()
+        with log:
+            log.record([PlaceChange(None, None, None, 1)])
+            self.assertEqual(log.get_changes(0), ([], 0))
+        self.assertEqual(len(log.get_changes(0)[0]), 1)
+
+
+if __name__ == "__main__" :
+    unittest.main()